@@ -1,12 +1,120 @@
 """Agent-based tunnelling algorithms for 3D fields.
 
 This module provides functions to carve tunnels or modify 3D scalar
-fields using agent-based approaches such as random walks.
+fields using agent-based approaches such as random walks. Compiled,
+multi-threaded Numba kernels are used when Numba is installed, with a
+NumPy fallback.
 """
 
 from typing import Optional
 import numpy as np
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _walk_agents_nb(mask, packed, coords, starts, walks, restarts):
+        """Numba kernel tracing agent positions, one agent per thread.
+        
+        Args:
+            mask: 3D uint8 mask of valid agent positions
+            packed: Whether mask is bit-packed along the last axis
+            coords: (N, 3) voxel coordinates inside the mask
+            starts: (n_agents,) indices into coords of starting positions
+            walks: (n_agents, agent_steps, 3) walk steps in {-1, 0, 1}
+            restarts: (n_agents, agent_steps) indices into coords used
+                      when an agent leaves the mask
+        
+        Returns:
+            (n_agents, agent_steps, 3) array of carving positions
+        """
+        n = mask.shape[0]
+        n_agents, agent_steps, _ = walks.shape
+        positions = np.empty((n_agents, agent_steps, 3), dtype=np.int64)
+        
+        for a in prange(n_agents):
+            x = coords[starts[a], 0]
+            y = coords[starts[a], 1]
+            z = coords[starts[a], 2]
+            
+            for s in range(agent_steps):
+                positions[a, s, 0] = x
+                positions[a, s, 1] = y
+                positions[a, s, 2] = z
+                
+                # Random walk step
+                x = min(max(x + walks[a, s, 0], 0), n - 1)
+                y = min(max(y + walks[a, s, 1], 0), n - 1)
+                z = min(max(z + walks[a, s, 2], 0), n - 1)
+                
+                # If agent leaves mask, restart at random position
+                if packed:
+                    inside = (mask[x, y, z >> 3] >> (z & 7)) & 1
+                else:
+                    inside = mask[x, y, z]
+                if not inside:
+                    x = coords[restarts[a, s], 0]
+                    y = coords[restarts[a, s], 1]
+                    z = coords[restarts[a, s], 2]
+        
+        return positions
+    
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _carve_positions_nb(field, positions, plane_starts, radius, reduction_factor):
+        """Numba kernel carving spheres around positions, one x-plane per thread.
+        
+        Each thread owns a single x-plane of the field, so writes never
+        race and the result does not depend on thread scheduling.
+        
+        Args:
+            field: 3D field to carve (modified in place)
+            positions: (P, 3) carving positions sorted by x
+            plane_starts: (n + 1,) offsets into positions for each x value
+            radius: Tunnel radius (in grid units)
+            reduction_factor: Multiplier for field values in tunnel region
+        """
+        n = field.shape[0]
+        r = int(radius)
+        r2 = radius * radius
+        
+        for i in prange(n):
+            lo = plane_starts[max(i - r, 0)]
+            hi = plane_starts[min(i + r + 1, n)]
+            
+            for p in range(lo, hi):
+                di = i - positions[p, 0]
+                y = positions[p, 1]
+                z = positions[p, 2]
+                
+                for dj in range(-r, r + 1):
+                    j = y + dj
+                    if j < 0 or j >= n:
+                        continue
+                    for dk in range(-r, r + 1):
+                        k = z + dk
+                        if k < 0 or k >= n:
+                            continue
+                        if di * di + dj * dj + dk * dk <= r2:
+                            field[i, j, k] *= reduction_factor
+
+
+def _mask_coords(mask: np.ndarray, packed: bool, nz: int) -> np.ndarray:
+    """Return (N, 3) voxel coordinates inside a plain or bit-packed mask."""
+    if not packed:
+        return np.argwhere(mask)
+    
+    # Unpack one x-plane at a time to keep the full mask packed
+    planes = []
+    for i in range(mask.shape[0]):
+        jk = np.argwhere(np.unpackbits(mask[i], axis=-1, count=nz, bitorder="little"))
+        planes.append(np.column_stack([np.full(len(jk), i, dtype=jk.dtype), jk]))
+    return np.concatenate(planes)
+
 
 def carve_tunnels_random_walk(
     field: np.ndarray,
@@ -15,7 +123,8 @@ def carve_tunnels_random_walk(
     agent_steps: int = 100,
     radius: float = 1.0,
     reduction_factor: float = 0.3,
-    random_seed: Optional[int] = None
+    random_seed: Optional[int] = None,
+    use_numba: bool = True
 ) -> np.ndarray:
     """Carve tunnels through a 3D scalar field using random walk agents.
     
@@ -25,17 +134,23 @@ def carve_tunnels_random_walk(
     
     Args:
         field: 3D scalar field to modify
-        mask: Boolean mask defining valid region (agents stay within mask)
+        mask: Boolean mask defining valid region (agents stay within mask),
+              or a bit-packed mask from make_*_mask(packed=True)
         n_agents: Number of tunnelling agents
         agent_steps: Number of steps each agent takes
         radius: Tunnel radius (in grid units)
         reduction_factor: Multiplier for field values in tunnel region (0-1)
                           Lower values create deeper tunnels
         random_seed: Random seed for reproducibility
+        use_numba: Use the compiled Numba kernel if Numba is installed
     
     Returns:
         Modified field with tunnels carved
         
+    Raises:
+        ValueError: If mask shape matches neither the field nor its
+                    bit-packed form
+        
     Example:
         >>> field = np.random.rand(64, 64, 64)
         >>> mask = np.ones((64, 64, 64), dtype=bool)
@@ -47,46 +162,94 @@ def carve_tunnels_random_walk(
         return field.copy()
     
     n = field.shape[0]
+    packed_shape = field.shape[:-1] + ((field.shape[-1] + 7) // 8,)
+    packed = mask.shape != field.shape
+    if packed and (mask.shape != packed_shape or mask.dtype != np.uint8):
+        raise ValueError(
+            f"Mask shape {mask.shape} doesn't match field shape {field.shape} "
+            f"or packed shape {packed_shape}"
+        )
+    
     rng = np.random.default_rng(random_seed)
-    coords = np.array(np.where(mask)).T
+    coords = _mask_coords(mask, packed, field.shape[-1])
     
     if len(coords) == 0:
         return field.copy()
     
-    f = field.copy()
+    f = np.array(field, order="C")
+    
+    # Draw all randomness up front: start and restart positions as
+    # indices into coords, and every walk step
+    starts = rng.integers(0, len(coords), size=n_agents)
+    walks = rng.integers(-1, 2, size=(n_agents, agent_steps, 3), dtype=np.int8)
+    restarts = rng.integers(0, len(coords), size=(n_agents, agent_steps))
+    
+    if use_numba and NUMBA_AVAILABLE:
+        mask_u8 = mask if packed else np.asarray(mask, dtype=bool).view(np.uint8)
+        positions = _walk_agents_nb(mask_u8, packed, coords, starts, walks, restarts).reshape(-1, 3)
+        
+        # Bucket positions by x so each plane only visits nearby agents
+        positions = positions[np.argsort(positions[:, 0], kind="stable")]
+        plane_starts = np.searchsorted(positions[:, 0], np.arange(n + 1))
+        _carve_positions_nb(
+            f, positions, plane_starts,
+            float(radius), f.dtype.type(reduction_factor)
+        )
+        return f
     
-    for _ in range(n_agents):
+    # Precompute voxel offsets inside the carving sphere (radius is fixed)
+    r = int(radius)
+    span = np.arange(-r, r + 1)
+    DX, DY, DZ = np.meshgrid(span, span, span, indexing="ij")
+    inside = DX**2 + DY**2 + DZ**2 <= radius**2
+    ox = DX[inside].astype(np.int32)
+    oy = DY[inside].astype(np.int32)
+    oz = DZ[inside].astype(np.int32)
+    flat_offsets = (ox.astype(np.intp) * n + oy) * n + oz
+    
+    # Flat view of the (contiguous) copy for direct index writes
+    f_flat = f.reshape(-1)
+    
+    # Plain ints avoid NumPy scalar overhead in the per-step arithmetic
+    start_positions = coords[starts].tolist()
+    
+    for a in range(n_agents):
         # Start agent at random position within mask
-        x, y, z = coords[rng.integers(0, len(coords))]
+        x, y, z = start_positions[a]
         
-        for _ in range(agent_steps):
-            # Define carving region
-            xs = slice(max(0, int(x - radius)), min(n, int(x + radius + 1)))
-            ys = slice(max(0, int(y - radius)), min(n, int(y + radius + 1)))
-            zs = slice(max(0, int(z - radius)), min(n, int(z + radius + 1)))
-            
-            # Create distance mask for spherical carving
-            X, Y, Z = np.meshgrid(
-                np.arange(xs.start, xs.stop),
-                np.arange(ys.start, ys.stop),
-                np.arange(zs.start, zs.stop),
-                indexing="ij",
-            )
-            R = np.sqrt((X - x)**2 + (Y - y)**2 + (Z - z)**2)
-            carve_mask = R <= radius
-            
-            # Reduce field values in tunnel region
-            f[xs, ys, zs][carve_mask] *= reduction_factor
+        # Convert one agent's steps at a time to bound list memory
+        agent_walk = walks[a].tolist()
+        
+        for s in range(agent_steps):
+            # Reduce field values in spherical tunnel region
+            centre = (x * n + y) * n + z
+            if r <= min(x, y, z) and max(x, y, z) < n - r:
+                f_flat[flat_offsets + centre] *= reduction_factor
+            else:
+                # Near the grid edge: drop offsets that fall outside
+                ix = ox + x
+                iy = oy + y
+                iz = oz + z
+                valid = (
+                    (ix >= 0) & (ix < n) &
+                    (iy >= 0) & (iy < n) &
+                    (iz >= 0) & (iz < n)
+                )
+                f_flat[flat_offsets[valid] + centre] *= reduction_factor
             
             # Random walk step
-            dx, dy, dz = rng.integers(-1, 2, size=3)
-            x = np.clip(x + dx, 0, n - 1)
-            y = np.clip(y + dy, 0, n - 1)
-            z = np.clip(z + dz, 0, n - 1)
+            dx, dy, dz = agent_walk[s]
+            x = min(max(x + dx, 0), n - 1)
+            y = min(max(y + dy, 0), n - 1)
+            z = min(max(z + dz, 0), n - 1)
             
             # If agent leaves mask, restart at random position
-            if not mask[int(x), int(y), int(z)]:
-                x, y, z = coords[rng.integers(0, len(coords))]
+            if packed:
+                in_mask = (mask[x, y, z >> 3] >> (z & 7)) & 1
+            else:
+                in_mask = mask[x, y, z]
+            if not in_mask:
+                x, y, z = coords[restarts[a, s]].tolist()
     
     return f
 
@@ -18,6 +18,8 @@ from .boundaries import (
     make_cylinder_mask,
     make_sphere_mask,
     make_box_mask,
+    pack_mask,
+    unpack_mask,
 )
 
 __all__ = [
@@ -35,4 +37,6 @@ __all__ = [
     'make_cylinder_mask',
     'make_sphere_mask',
     'make_box_mask',
+    'pack_mask',
+    'unpack_mask',
 ]
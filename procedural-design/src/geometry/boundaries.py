@@ -1,17 +1,97 @@
 """Boundary and shape generation utilities.
 
 This module provides functions to generate masks and boundaries
-for 3D reaction-diffusion simulations and mesh generation.
+for 3D reaction-diffusion simulations and mesh generation. Large vase
+masks are built with a compiled Numba kernel when Numba is installed.
 """
 
+from functools import lru_cache
 from typing import Tuple
 import numpy as np
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Grid size from which the Numba vase kernel is used
+_NUMBA_MIN_N = 256
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, boundscheck=False)
+    def _vase_mask_nb(lin, radius_z2, out):
+        """Numba kernel filling a vase mask without n³ temporaries.
+        
+        Args:
+            lin: (n,) grid coordinates in [-1, 1]
+            radius_z2: (n,) squared vase radius at each z
+            out: (n, n, n) boolean array to fill
+        """
+        n = lin.shape[0]
+        for i in prange(n):
+            xi2 = lin[i] * lin[i]
+            for j in range(n):
+                r2 = xi2 + lin[j] * lin[j]
+                for k in range(n):
+                    out[i, j, k] = r2 <= radius_z2[k]
+
+
+@lru_cache(maxsize=8)
+def _coords(n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return cached broadcastable grid coordinates in [-1, 1].
+    
+    Args:
+        n: Grid resolution
+    
+    Returns:
+        Read-only (x, y, z) views of shape (n, 1, 1), (1, n, 1), (1, 1, n)
+    """
+    lin = np.linspace(-1, 1, n)
+    lin.flags.writeable = False
+    return lin[:, None, None], lin[None, :, None], lin[None, None, :]
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean mask into bits along its last axis.
+    
+    Bit ``k & 7`` of byte ``k >> 3`` holds voxel ``k``, so membership
+    can be tested without unpacking via
+    ``(packed[i, j, k >> 3] >> (k & 7)) & 1``.
+    
+    Args:
+        mask: Boolean 3D array
+    
+    Returns:
+        uint8 array of shape (nx, ny, ceil(nz / 8))
+    """
+    return np.packbits(mask, axis=-1, bitorder="little")
+
+
+def unpack_mask(packed: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """Unpack a bit-packed mask back to a boolean array.
+    
+    Args:
+        packed: Packed mask from pack_mask or make_*_mask(packed=True)
+        shape: Shape of the original boolean mask
+    
+    Returns:
+        Boolean array of the given shape
+        
+    Example:
+        >>> packed = make_sphere_mask(n=64, packed=True)
+        >>> mask = unpack_mask(packed, (64, 64, 64))
+    """
+    mask = np.unpackbits(packed, axis=-1, count=shape[-1], bitorder="little")
+    return mask.view(bool).reshape(shape)
+
 
 def make_vase_mask(
     n: int = 64,
     radius_frac: float = 0.7,
-    taper: float = 0.3
+    taper: float = 0.3,
+    packed: bool = False
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Create a vase-like mask in an n³ grid.
     
@@ -22,91 +102,103 @@ def make_vase_mask(
         n: Grid resolution (n×n×n)
         radius_frac: Base radius as fraction of half-grid (0-1)
         taper: Taper factor (0 = cylinder, higher = stronger taper toward top)
+        packed: Return the mask bit-packed along the last axis (see pack_mask)
     
     Returns:
         Tuple of (mask, Z_norm) where:
         - mask: Boolean 3D array (True inside vase)
-        - Z_norm: Normalised Z coordinates (0 bottom, 1 top)
+        - Z_norm: Normalised Z coordinates (0 bottom, 1 top), as a
+          read-only broadcast view
         
     Example:
         >>> mask, z_norm = make_vase_mask(n=64, radius_frac=0.7, taper=0.3)
         >>> print(f"Vase volume: {mask.sum()} voxels")
     """
-    lin = np.linspace(-1, 1, n)
-    X, Y, Z = np.meshgrid(lin, lin, lin, indexing="ij")
+    x, y, z = _coords(n)
     
-    R_xy = np.sqrt(X**2 + Y**2)
-    Z_norm = (Z + 1.0) / 2.0  # 0 bottom, 1 top
+    Z_norm = (z + 1.0) / 2.0  # 0 bottom, 1 top
     
     base_radius = radius_frac
     radius_z = base_radius * (1.0 - taper * Z_norm)
     
-    mask = R_xy <= radius_z
-    return mask.astype(bool), Z_norm
+    # Compare squared radii; only the final mask is n³
+    if NUMBA_AVAILABLE and n >= _NUMBA_MIN_N:
+        mask = np.empty((n, n, n), dtype=bool)
+        _vase_mask_nb(x.ravel(), (radius_z * radius_z).ravel(), mask)
+    else:
+        mask = x * x + y * y <= radius_z * radius_z
+    Z_norm = np.broadcast_to(Z_norm, mask.shape)
+    
+    if packed:
+        mask = pack_mask(mask)
+    return mask, Z_norm
 
 
 def make_cylinder_mask(
     n: int = 64,
-    radius_frac: float = 0.7
+    radius_frac: float = 0.7,
+    packed: bool = False
 ) -> Tuple[np.ndarray, np.ndarray]:
     """Create a cylindrical mask in an n³ grid.
     
     Args:
         n: Grid resolution (n×n×n)
         radius_frac: Radius as fraction of half-grid (0-1)
+        packed: Return the mask bit-packed along the last axis (see pack_mask)
     
     Returns:
         Tuple of (mask, Z_norm) where:
         - mask: Boolean 3D array (True inside cylinder)
-        - Z_norm: Normalised Z coordinates (0 bottom, 1 top)
+        - Z_norm: Normalised Z coordinates (0 bottom, 1 top), as a
+          read-only broadcast view
     """
-    return make_vase_mask(n=n, radius_frac=radius_frac, taper=0.0)
+    return make_vase_mask(n=n, radius_frac=radius_frac, taper=0.0, packed=packed)
 
 
 def make_sphere_mask(
     n: int = 64,
-    radius_frac: float = 0.7
+    radius_frac: float = 0.7,
+    packed: bool = False
 ) -> np.ndarray:
     """Create a spherical mask in an n³ grid.
     
     Args:
         n: Grid resolution (n×n×n)
         radius_frac: Radius as fraction of half-grid (0-1)
+        packed: Return the mask bit-packed along the last axis (see pack_mask)
     
     Returns:
         Boolean 3D array (True inside sphere)
     """
-    lin = np.linspace(-1, 1, n)
-    X, Y, Z = np.meshgrid(lin, lin, lin, indexing="ij")
+    x, y, z = _coords(n)
     
-    R = np.sqrt(X**2 + Y**2 + Z**2)
-    mask = R <= radius_frac
+    mask = x * x + y * y + z * z <= radius_frac * radius_frac
     
-    return mask.astype(bool)
+    return pack_mask(mask) if packed else mask
 
 
 def make_box_mask(
     n: int = 64,
-    size_frac: float = 0.8
+    size_frac: float = 0.8,
+    packed: bool = False
 ) -> np.ndarray:
     """Create a box/cube mask in an n³ grid.
     
     Args:
         n: Grid resolution (n×n×n)
         size_frac: Size as fraction of grid (0-1)
+        packed: Return the mask bit-packed along the last axis (see pack_mask)
     
     Returns:
         Boolean 3D array (True inside box)
     """
-    lin = np.linspace(-1, 1, n)
-    X, Y, Z = np.meshgrid(lin, lin, lin, indexing="ij")
+    x, y, z = _coords(n)
     
-    half_size = size_frac
+    # Combine 1-D per-axis tests; only the final mask is n³
     mask = (
-        (np.abs(X) <= half_size) &
-        (np.abs(Y) <= half_size) &
-        (np.abs(Z) <= half_size)
+        (np.abs(x) <= size_frac) &
+        (np.abs(y) <= size_frac) &
+        (np.abs(z) <= size_frac)
     )
     
-    return mask.astype(bool)
-
+    return pack_mask(mask) if packed else mask
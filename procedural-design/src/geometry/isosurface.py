@@ -84,21 +84,26 @@ def smooth_mesh_laplacian(
     """
     vertices = mesh.vertices.copy()
     
+    # Compute vertex neighbors once (topology does not change), as a flat
+    # index array grouped by vertex
+    edges = mesh.edges_unique
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(rows, kind="stable")
+    neighbor_idx = cols[order]
+    
+    degrees = np.bincount(rows, minlength=len(vertices))
+    has_neighbors = degrees > 0
+    offsets = np.concatenate([[0], np.cumsum(degrees)[:-1]])[has_neighbors]
+    
     for _ in range(iterations):
-        # Compute vertex neighbors
-        vertex_neighbors = [set() for _ in range(len(vertices))]
-        for face in mesh.faces:
-            for i in range(3):
-                vertex_neighbors[face[i]].update([face[(i+1)%3], face[(i+2)%3]])
-        
         # Laplacian smoothing
-        new_vertices = vertices.copy()
-        for i, neighbors in enumerate(vertex_neighbors):
-            if len(neighbors) > 0:
-                neighbor_positions = vertices[list(neighbors)]
-                laplacian = neighbor_positions.mean(axis=0) - vertices[i]
-                new_vertices[i] = vertices[i] + lambda_factor * laplacian
+        neighbor_sum = np.add.reduceat(vertices[neighbor_idx], offsets, axis=0)
+        neighbor_mean = neighbor_sum / degrees[has_neighbors, None]
+        laplacian = neighbor_mean - vertices[has_neighbors]
         
+        new_vertices = vertices.copy()
+        new_vertices[has_neighbors] += lambda_factor * laplacian
         vertices = new_vertices
     
     return trimesh.Trimesh(vertices=vertices, faces=mesh.faces)
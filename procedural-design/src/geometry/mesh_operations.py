@@ -8,18 +8,98 @@ This module provides comprehensive mesh operations including:
 - Mesh repair and analysis utilities
 """
 
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List, Literal
 import numpy as np
 import trimesh
+from scipy import sparse
 from skimage import measure
 
 
+def _marching_cubes_blocks(
+    field: np.ndarray,
+    isovalue: float,
+    spacing: Tuple[float, float, float],
+    block_size: int,
+    mask: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run marching cubes over a field in overlapping blocks.
+    
+    Each block spans block_size cells plus a one-sample halo on its
+    +x/+y/+z faces, so every cell is processed exactly once and only
+    one block is held as float32 at a time. Vertices on block seams are
+    duplicated and must be merged by the caller.
+    
+    Args:
+        field: 3D scalar field
+        isovalue: Isosurface threshold value
+        spacing: Voxel spacing in (x, y, z)
+        block_size: Number of cells per block along each axis
+        mask: Optional boolean array; voxels outside it are skipped
+        
+    Returns:
+        Tuple of (vertices, faces, normals)
+        
+    Raises:
+        ValueError: If isovalue is outside the field's value range
+    """
+    nx, ny, nz = field.shape
+    spacing_arr = np.asarray(spacing, dtype=np.float64)
+    all_vertices, all_faces, all_normals = [], [], []
+    n_vertices = 0
+    
+    for i in range(0, max(nx - 1, 1), block_size):
+        for j in range(0, max(ny - 1, 1), block_size):
+            for k in range(0, max(nz - 1, 1), block_size):
+                window = (
+                    slice(i, i + block_size + 1),
+                    slice(j, j + block_size + 1),
+                    slice(k, k + block_size + 1)
+                )
+                block = field[window]
+                block_mask = None
+                
+                # Skip blocks the surface cannot pass through
+                if block.min() > isovalue or block.max() < isovalue:
+                    continue
+                if mask is not None:
+                    block_mask = np.ascontiguousarray(mask[window])
+                    if not block_mask.any():
+                        continue
+                
+                try:
+                    vertices, faces, normals, _ = measure.marching_cubes(
+                        np.ascontiguousarray(block, dtype=np.float32),
+                        level=isovalue,
+                        spacing=spacing,
+                        method='lewiner',
+                        mask=block_mask
+                    )
+                except RuntimeError:
+                    continue  # Level touches the block but no surface crosses it
+                
+                all_vertices.append(vertices + np.array([i, j, k]) * spacing_arr)
+                all_faces.append(faces + n_vertices)
+                all_normals.append(normals)
+                n_vertices += len(vertices)
+    
+    if not all_vertices:
+        raise ValueError("Surface level must be within volume data range.")
+    
+    return (
+        np.concatenate(all_vertices),
+        np.concatenate(all_faces),
+        np.concatenate(all_normals)
+    )
+
+
 def extract_isosurface(
     field: np.ndarray,
     isovalue: float = 0.5,
     spacing: Tuple[float, float, float] = (1.0, 1.0, 1.0),
     smooth: bool = True,
-    smooth_iterations: int = 3
+    smooth_iterations: int = 3,
+    block_size: Optional[int] = None,
+    mask: Optional[np.ndarray] = None
 ) -> trimesh.Trimesh:
     """Extract isosurface from 3D scalar field using marching cubes.
     
@@ -29,27 +109,54 @@ def extract_isosurface(
         spacing: Voxel spacing in (x, y, z)
         smooth: Apply Laplacian smoothing
         smooth_iterations: Number of smoothing iterations
+        block_size: If set, extract in blocks of this many cells per axis
+                    to bound memory use on large fields (e.g. 128)
+        mask: Optional boolean array (same shape as field) restricting
+              extraction to voxels inside it, e.g. from make_vase_mask;
+              skipping empty space speeds up extraction
         
     Returns:
         Extracted mesh
         
     Raises:
-        ValueError: If field is not 3D
+        ValueError: If field is not 3D, block_size is not positive, or
+                    mask shape doesn't match field
         
     Example:
         >>> field = np.random.rand(100, 100, 100)
         >>> mesh = extract_isosurface(field, isovalue=0.5)
         >>> mesh.export('surface.stl')
+        >>> big = extract_isosurface(large_field, isovalue=0.5, block_size=128)
     """
     if field.ndim != 3:
         raise ValueError(f"Field must be 3D, got shape {field.shape}")
     
-    # Extract surface using marching cubes
-    vertices, faces, normals, values = measure.marching_cubes(
-        field,
-        level=isovalue,
-        spacing=spacing
-    )
+    if mask is not None:
+        if mask.shape != field.shape:
+            raise ValueError(
+                f"Mask shape {mask.shape} doesn't match field shape {field.shape}"
+            )
+        mask = np.asarray(mask, dtype=bool)
+    
+    if block_size is not None:
+        if block_size <= 0:
+            raise ValueError(f"block_size must be positive, got {block_size}")
+        
+        vertices, faces, normals = _marching_cubes_blocks(
+            field, float(isovalue), spacing, block_size, mask
+        )
+    else:
+        # Marching cubes is bound by reading the field, so scan it as float32
+        field = np.ascontiguousarray(field, dtype=np.float32)
+        
+        # Extract surface using marching cubes
+        vertices, faces, normals, values = measure.marching_cubes(
+            field,
+            level=float(isovalue),
+            spacing=spacing,
+            method='lewiner',
+            mask=mask
+        )
     
     # Create mesh
     mesh = trimesh.Trimesh(
@@ -59,6 +166,11 @@ def extract_isosurface(
         process=True
     )
     
+    if block_size is not None:
+        # Seam vertices get one-sided normals from each block, so merge
+        # them on position alone
+        mesh.merge_vertices(merge_norm=True)
+    
     # Optional smoothing
     if smooth:
         mesh = smooth_mesh(mesh, iterations=smooth_iterations)
@@ -101,8 +213,12 @@ def apply_displacement(
                 f"doesn't match vertex count {len(mesh.vertices)}"
             )
         
-        displacement = mesh.vertex_normals * displacement_field[:, np.newaxis]
-        mesh_copy.vertices += amplitude * displacement
+        # Scale the (N,) field first so only one (N, 3) temporary is built
+        offsets = np.multiply(
+            mesh.vertex_normals,
+            (amplitude * displacement_field)[:, np.newaxis]
+        )
+        mesh_copy.vertices += offsets
     else:
         # Direct displacement vectors
         if displacement_field.shape != mesh.vertices.shape:
@@ -116,6 +232,34 @@ def apply_displacement(
     return mesh_copy
 
 
+def _neighbor_average_matrix(mesh: trimesh.Trimesh) -> sparse.csr_matrix:
+    """Build a sparse matrix averaging each vertex's neighbours.
+    
+    Row i holds 1/deg(i) for each neighbour of vertex i, so ``A @ V``
+    gives the neighbour mean of every vertex. Isolated vertices map to
+    themselves so smoothing leaves them in place.
+    
+    Args:
+        mesh: Input mesh
+        
+    Returns:
+        (N, N) CSR matrix
+    """
+    n = len(mesh.vertices)
+    edges = mesh.edges_unique
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    
+    degrees = np.bincount(rows, minlength=n)
+    isolated = np.flatnonzero(degrees == 0)
+    
+    rows = np.concatenate([rows, isolated])
+    cols = np.concatenate([cols, isolated])
+    data = 1.0 / np.maximum(degrees, 1)[rows]
+    
+    return sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+
+
 def smooth_mesh(
     mesh: trimesh.Trimesh,
     iterations: int = 3,
@@ -137,34 +281,46 @@ def smooth_mesh(
     """
     mesh_copy = mesh.copy()
     
+    if iterations <= 0:
+        return mesh_copy
+    
+    # Topology is fixed, so build the neighbour-average operator once
+    A = _neighbor_average_matrix(mesh_copy)
+    
+    # Keep a C-contiguous (N, 3) block: the sparse product streams all
+    # three coordinates of each neighbour per matrix entry
+    vertices = np.array(mesh_copy.vertices, dtype=np.float64, order='C')
+    
+    # Laplacian smoothing: one sparse matrix product per iteration,
+    # blended in place
     for _ in range(iterations):
-        # Compute vertex neighbors
-        vertex_neighbors = mesh_copy.vertex_neighbors
-        
-        # Laplacian smoothing
-        new_vertices = mesh_copy.vertices.copy()
-        for i, neighbors in enumerate(vertex_neighbors):
-            if len(neighbors) > 0:
-                neighbor_mean = mesh_copy.vertices[neighbors].mean(axis=0)
-                new_vertices[i] = (
-                    (1 - lambda_factor) * mesh_copy.vertices[i] +
-                    lambda_factor * neighbor_mean
-                )
-        
-        mesh_copy.vertices = new_vertices
+        neighbor_mean = A @ vertices
+        neighbor_mean *= lambda_factor
+        vertices *= 1 - lambda_factor
+        vertices += neighbor_mean
     
+    mesh_copy.vertices = vertices
     return mesh_copy
 
 
-def validate_mesh(mesh: trimesh.Trimesh) -> Dict[str, Any]:
+def validate_mesh(
+    mesh: trimesh.Trimesh,
+    level: Literal['fast', 'full'] = 'full'
+) -> Dict[str, Any]:
     """Validate mesh for 3D printing and general quality.
     
     This is the comprehensive validation function used by CLI tools
     and pipelines. Returns detailed validation results including
     statistics, warnings, and errors.
     
+    The 'fast' level is intended for meshes just built with
+    ``trimesh.Trimesh(..., process=True)``, which already merges
+    duplicate vertices. It skips the duplicate-vertex and volume checks;
+    their result entries are reported as None.
+    
     Args:
         mesh: Mesh to validate
+        level: 'full' for all checks, 'fast' to skip the expensive ones
         
     Returns:
         Dictionary with validation results including:
@@ -187,50 +343,72 @@ def validate_mesh(mesh: trimesh.Trimesh) -> Dict[str, Any]:
         >>> results = validate_mesh(mesh)
         >>> if results['is_valid']:
         ...     print("Mesh is ready for printing!")
+        
+    Raises:
+        ValueError: If level is not 'fast' or 'full'
     """
-    results: Dict[str, Any] = {
-        'is_valid': True,
-        'is_watertight': mesh.is_watertight,
-        'is_winding_consistent': mesh.is_winding_consistent,
-        'num_vertices': len(mesh.vertices),
-        'num_faces': len(mesh.faces),
-        'volume': mesh.volume if mesh.is_volume else None,
-        'surface_area': mesh.area,
-        'bounds': mesh.bounds,
-        'warnings': [],
-        'errors': []
-    }
-    
-    # Check watertight
-    if not mesh.is_watertight:
-        results['is_valid'] = False
-        results['errors'].append("Mesh is not watertight (has holes)")
-    
-    # Check winding
-    if not mesh.is_winding_consistent:
-        results['warnings'].append("Face winding is inconsistent")
-    
-    # Check for degenerate faces
-    degenerate = np.isclose(mesh.area_faces, 0).sum()
-    if degenerate > 0:
-        results['is_valid'] = False
-        results['errors'].append(f"Found {degenerate} degenerate faces (zero area)")
-        results['degenerate_faces'] = int(degenerate)
-    
-    # Check for duplicate vertices
-    unique_verts = len(np.unique(mesh.vertices, axis=0))
-    duplicates = len(mesh.vertices) - unique_verts
-    if duplicates > 0:
-        results['warnings'].append(f"Found {duplicates} duplicate vertices")
-        results['duplicate_vertices'] = int(duplicates)
+    if level not in ('fast', 'full'):
+        raise ValueError(f"Unknown validation level: {level}")
+    full = level == 'full'
+    
+    # The mesh is not modified here, so hold the trimesh cache to skip
+    # re-hashing vertices/faces on every cached property access. Verify
+    # first: holding the lock skips the hash check, so entries left over
+    # from in-place edits would otherwise be read and then re-validated
+    mesh._cache.verify()
+    with mesh._cache:
+        # Read each property once; face areas feed area, face normals
+        # feed volume and winding checks
+        is_watertight = mesh.is_watertight
+        is_winding_consistent = mesh.is_winding_consistent
+        area_faces = mesh.area_faces
+        is_volume = mesh.is_volume if full else None
+        bounds = mesh.bounds
+        
+        results: Dict[str, Any] = {
+            'is_valid': True,
+            'is_watertight': is_watertight,
+            'is_winding_consistent': is_winding_consistent,
+            'num_vertices': len(mesh.vertices),
+            'num_faces': len(mesh.faces),
+            'volume': mesh.volume if is_volume else None,
+            'surface_area': mesh.area,
+            'bounds': bounds,
+            'warnings': [],
+            'errors': []
+        }
+        
+        # Check watertight
+        if not is_watertight:
+            results['is_valid'] = False
+            results['errors'].append("Mesh is not watertight (has holes)")
+        
+        # Check winding
+        if not is_winding_consistent:
+            results['warnings'].append("Face winding is inconsistent")
+        
+        # Check for degenerate faces
+        degenerate = np.isclose(area_faces, 0).sum()
+        if degenerate > 0:
+            results['is_valid'] = False
+            results['errors'].append(f"Found {degenerate} degenerate faces (zero area)")
+            results['degenerate_faces'] = int(degenerate)
+        
+        # Check for duplicate vertices (hashed rows, same tolerance as merge_vertices)
+        duplicates = None
+        if full:
+            unique_verts = len(trimesh.grouping.unique_rows(mesh.vertices)[0])
+            duplicates = len(mesh.vertices) - unique_verts
+            if duplicates > 0:
+                results['warnings'].append(f"Found {duplicates} duplicate vertices")
+                results['duplicate_vertices'] = int(duplicates)
     
     # Check for self-intersections (expensive, skip for large meshes)
-    if len(mesh.faces) < 50000:
-        if not mesh.is_volume:
+    if full and len(mesh.faces) < 50000:
+        if not is_volume:
             results['warnings'].append("Mesh may have self-intersections or is not a volume")
     
     # Compute bounding box dimensions
-    bounds = mesh.bounds
     size = bounds[1] - bounds[0]
     results['dimensions'] = {
         'x': float(size[0]),
@@ -240,8 +418,8 @@ def validate_mesh(mesh: trimesh.Trimesh) -> Dict[str, Any]:
     
     # Add boolean flags for compatibility with pipelines that expect simpler interface
     results['has_degenerate_faces'] = degenerate > 0
-    results['has_duplicate_vertices'] = duplicates > 0
-    results['is_volume'] = mesh.is_volume
+    results['has_duplicate_vertices'] = duplicates > 0 if full else None
+    results['is_volume'] = is_volume
     
     return results
 
@@ -368,7 +546,8 @@ def slice_mesh_horizontal(
 ) -> np.ndarray:
     """Slice mesh at a given height and return 2D contour.
     
-    Useful for generating 2D profiles from 3D meshes.
+    Useful for generating 2D profiles from 3D meshes. To slice at many
+    heights, use slice_mesh_horizontal_multi.
     
     Args:
         mesh: Mesh to slice
@@ -382,17 +561,67 @@ def slice_mesh_horizontal(
         >>> contour = slice_mesh_horizontal(mesh, z_height=50.0)
         >>> plt.plot(contour[:, 0], contour[:, 1])
     """
-    # Use trimesh's section method
-    section = mesh.section(plane_origin=[0, 0, z_height],
-                          plane_normal=[0, 0, 1])
+    return slice_mesh_horizontal_multi(mesh, np.array([z_height]))[0]
+
+
+def slice_mesh_horizontal_multi(
+    mesh: trimesh.Trimesh,
+    z_heights: np.ndarray
+) -> List[np.ndarray]:
+    """Slice mesh at several heights and return 2D contours.
     
-    if section is None:
-        return np.array([])
+    Vertex heights and per-face z-extents are computed once and shared
+    by all planes. Faces are sorted by their lowest z so each plane only
+    intersects the faces whose z-extent spans it (span-space filtering),
+    which is much cheaper than calling slice_mesh_horizontal per height.
     
-    # Get 2D coordinates
-    coords, _ = section.to_planar()
+    Args:
+        mesh: Mesh to slice
+        z_heights: Z heights at which to slice
+        
+    Returns:
+        List with one array of 2D contour points (N, 2) in (x, y)
+        coordinates per height (empty where the plane misses the mesh)
+        
+    Example:
+        >>> mesh = trimesh.load('vase.stl')
+        >>> contours = slice_mesh_horizontal_multi(mesh, np.linspace(0, 150, 100))
+    """
+    z = mesh.vertices[:, 2]
+    face_z = z[mesh.faces]
+    zmin = face_z.min(axis=1)
+    zmax = face_z.max(axis=1)
+    
+    # Sort faces by lowest z so candidates for a plane are a prefix
+    order = np.argsort(zmin, kind='stable')
+    zmin_sorted = zmin[order]
+    
+    # Keep faces within trimesh's on-plane tolerance of each height
+    tol = trimesh.tol.merge
+    
+    contours = []
+    for z_height in np.asarray(z_heights, dtype=np.float64):
+        candidates = order[:np.searchsorted(zmin_sorted, z_height + tol, side='right')]
+        active = np.sort(candidates[zmax[candidates] >= z_height - tol])
+        
+        lines = None
+        if len(active) > 0:
+            lines = trimesh.intersections.mesh_plane(
+                mesh,
+                plane_normal=[0, 0, 1],
+                plane_origin=[0, 0, z_height],
+                local_faces=active,
+                cached_dots=z - z_height
+            )
+        
+        if lines is None or len(lines) == 0:
+            contours.append(np.array([]))
+            continue
+        
+        # Build a 2D path to merge segment endpoints into contour points
+        contours.append(trimesh.load_path(lines[:, :, :2]).vertices)
     
-    return coords.vertices
+    return contours
 
 
 def create_field_from_pattern(
@@ -414,14 +643,8 @@ def create_field_from_pattern(
         >>> pattern = np.random.rand(100, 100)
         >>> field = create_field_from_pattern(pattern, height_samples=50)
     """
-    h, w = pattern_2d.shape
-    field_3d = np.zeros((h, w, height_samples), dtype=pattern_2d.dtype)
-    
-    # Simple extrusion
-    for i in range(height_samples):
-        field_3d[:, :, i] = pattern_2d
-    
-    return field_3d
+    # Simple extrusion (single writable copy, no per-slice loop)
+    return np.repeat(pattern_2d[:, :, np.newaxis], height_samples, axis=2)
 
 
 def remesh_uniform(
@@ -222,7 +222,8 @@ class VasePipeline:
         if self.mesh is None:
             raise ValueError("No mesh generated yet. Call generate() first.")
         
-        return validate_mesh(self.mesh)
+        # Mesh was built with process=True, so skip duplicate-vertex checks
+        return validate_mesh(self.mesh, level='fast')
     
     def export(
         self,
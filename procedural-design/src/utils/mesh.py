@@ -20,13 +20,19 @@ def export_mesh(mesh, file_path, file_type='stl'):
 
     Parameters:
     mesh (trimesh.Trimesh): The mesh to export.
-    file_path (str): The path where the mesh will be saved.
+    file_path (str or None): The path where the mesh will be saved, or None
+        to export to memory and return the encoded data.
     file_type (str): The file format to export to ('stl', 'obj', etc.).
 
+    Returns:
+    bytes or str: The exported data (bytes for binary formats, str for text
+        formats such as 'obj'). When file_path is given, the same data is
+        also written to that path.
+
     Raises:
     ValueError: If the file type is not supported.
     """
     if file_type not in ['stl', 'obj', 'ply', '3mf']:
         raise ValueError(f"Unsupported file type: {file_type}")
 
-    mesh.export(file_path, file_type=file_type)
\ No newline at end of file
+    return mesh.export(file_path, file_type=file_type)
\ No newline at end of file
@@ -4,9 +4,45 @@ import pytest
 import numpy as np
 import trimesh
 from src.geometry.primitives import create_cylinder, create_hollow_cylinder, rounded_square_profile
-from src.geometry.isosurface import extract_isosurface, field_from_function
-from src.geometry.mesh_operations import validate_mesh, smooth_mesh
+from src.geometry.isosurface import extract_isosurface, field_from_function, smooth_mesh_laplacian
+from src.geometry.mesh_operations import (
+    validate_mesh, smooth_mesh, slice_mesh_horizontal, slice_mesh_horizontal_multi
+)
+from src.geometry import mesh_operations
 from src.geometry.sweep import sweep_circle_along_path
+from src.geometry import boundaries
+from src.geometry.boundaries import (
+    make_vase_mask, make_sphere_mask, make_box_mask, unpack_mask
+)
+
+
+def _noisy_icosphere(rng, isolated=False):
+    """Build a jittered icosphere, optionally with an unreferenced vertex at index 0."""
+    sphere = trimesh.creation.icosphere(subdivisions=2, radius=10.0)
+    vertices = sphere.vertices + rng.normal(scale=0.3, size=sphere.vertices.shape)
+    faces = sphere.faces
+    if isolated:
+        vertices = np.vstack([[50.0, 50.0, 50.0], vertices])
+        faces = faces + 1
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+
+
+def _reference_smooth(vertices, faces, iterations, lambda_factor):
+    """Per-vertex Laplacian smoothing towards the neighbour mean."""
+    neighbors = [set() for _ in range(len(vertices))]
+    for face in faces:
+        for i in range(3):
+            neighbors[face[i]].update([face[(i + 1) % 3], face[(i + 2) % 3]])
+    
+    vertices = np.array(vertices, dtype=np.float64)
+    for _ in range(iterations):
+        new_vertices = vertices.copy()
+        for i, nbrs in enumerate(neighbors):
+            if nbrs:
+                mean = vertices[list(nbrs)].mean(axis=0)
+                new_vertices[i] = (1 - lambda_factor) * vertices[i] + lambda_factor * mean
+        vertices = new_vertices
+    return vertices
 
 
 class TestPrimitives:
@@ -52,6 +88,47 @@ class TestPrimitives:
         assert path.shape[0] > 100  # Should have many points
 
 
+class TestBoundaries:
+    """Test boundary mask generation."""
+    
+    def test_vase_mask(self):
+        """Test vase mask shape and taper."""
+        mask, z_norm = make_vase_mask(n=32, radius_frac=0.7, taper=0.3)
+        
+        assert mask.shape == (32, 32, 32)
+        assert mask.dtype == bool
+        assert z_norm.shape == (32, 32, 32)
+        # Tapered: more voxels at the bottom than the top
+        assert mask[:, :, 0].sum() > mask[:, :, -1].sum()
+    
+    @pytest.mark.skipif(not boundaries.NUMBA_AVAILABLE, reason="Numba not available")
+    def test_vase_mask_numba_matches_numpy(self, monkeypatch):
+        """Test that the Numba vase kernel matches the NumPy version."""
+        monkeypatch.setattr(boundaries, "_NUMBA_MIN_N", 1)
+        mask_nb, _ = make_vase_mask(n=33, radius_frac=0.8, taper=0.5)
+        
+        monkeypatch.setattr(boundaries, "NUMBA_AVAILABLE", False)
+        mask_np, _ = make_vase_mask(n=33, radius_frac=0.8, taper=0.5)
+        
+        np.testing.assert_array_equal(mask_nb, mask_np)
+    
+    @pytest.mark.parametrize("n", [8, 30, 33])
+    def test_packed_mask_roundtrip(self, n):
+        """Test that packed masks unpack to the unpacked masks."""
+        mask, _ = make_vase_mask(n=n)
+        packed, _ = make_vase_mask(n=n, packed=True)
+        
+        assert packed.dtype == np.uint8
+        assert packed.shape == (n, n, (n + 7) // 8)
+        np.testing.assert_array_equal(unpack_mask(packed, mask.shape), mask)
+        
+        for make_mask in (make_sphere_mask, make_box_mask):
+            np.testing.assert_array_equal(
+                unpack_mask(make_mask(n=n, packed=True), (n, n, n)),
+                make_mask(n=n)
+            )
+
+
 class TestIsosurface:
     """Test isosurface extraction."""
     
@@ -95,12 +172,83 @@ class TestIsosurface:
         assert isinstance(mesh, trimesh.Trimesh)
         assert len(mesh.vertices) > 0
     
+    def test_extract_isosurface_blocks(self):
+        """Test that blocked extraction matches single-pass extraction."""
+        def sphere(x, y, z):
+            return x**2 + y**2 + z**2 - 100
+        
+        field, spacing = field_from_function(
+            bounds=((-15, 15), (-15, 15), (-15, 15)),
+            resolution=(30, 30, 30),
+            func=sphere
+        )
+        
+        full = mesh_operations.extract_isosurface(field, isovalue=0, spacing=spacing, smooth=False)
+        blocked = mesh_operations.extract_isosurface(
+            field, isovalue=0, spacing=spacing, smooth=False, block_size=8
+        )
+        
+        assert blocked.is_watertight
+        assert len(blocked.vertices) == len(full.vertices)
+        assert len(blocked.faces) == len(full.faces)
+        assert blocked.volume == pytest.approx(full.volume)
+    
+    def test_extract_isosurface_mask(self):
+        """Test that a mask restricts extraction to its voxels."""
+        def sphere(x, y, z):
+            return x**2 + y**2 + z**2 - 100
+        
+        field, spacing = field_from_function(
+            bounds=((-15, 15), (-15, 15), (-15, 15)),
+            resolution=(30, 30, 30),
+            func=sphere
+        )
+        half = np.zeros(field.shape, dtype=bool)
+        half[:15] = True
+        
+        full = mesh_operations.extract_isosurface(field, isovalue=0, spacing=spacing, smooth=False)
+        all_true = mesh_operations.extract_isosurface(
+            field, isovalue=0, spacing=spacing, smooth=False, mask=np.ones(field.shape, dtype=bool)
+        )
+        masked = mesh_operations.extract_isosurface(
+            field, isovalue=0, spacing=spacing, smooth=False, mask=half
+        )
+        blocked = mesh_operations.extract_isosurface(
+            field, isovalue=0, spacing=spacing, smooth=False, mask=half, block_size=8
+        )
+        
+        assert len(all_true.faces) == len(full.faces)
+        assert 0 < len(masked.faces) < len(full.faces)
+        assert len(blocked.faces) == len(masked.faces)
+    
+    def test_extract_isosurface_mask_shape_mismatch(self):
+        """Test that a mask of the wrong shape raises error."""
+        field = np.random.rand(10, 10, 10)
+        
+        with pytest.raises(ValueError, match="doesn't match field shape"):
+            mesh_operations.extract_isosurface(field, mask=np.ones((5, 5, 5), dtype=bool))
+    
     def test_extract_isosurface_invalid_dimension(self):
         """Test that 2D array raises error."""
         field_2d = np.random.rand(50, 50)
         
         with pytest.raises(ValueError, match="Field must be 3D"):
             extract_isosurface(field_2d)
+    
+    @pytest.mark.parametrize("isolated", [False, True])
+    def test_smooth_mesh_laplacian_matches_reference(self, rng, isolated):
+        """Test vectorised Laplacian smoothing against a per-vertex loop."""
+        mesh = _noisy_icosphere(rng, isolated=isolated)
+        
+        smoothed = smooth_mesh_laplacian(mesh, iterations=3, lambda_factor=0.5)
+        
+        # The result is processed, which drops unreferenced vertices
+        expected = trimesh.Trimesh(
+            vertices=_reference_smooth(mesh.vertices, mesh.faces, 3, 0.5),
+            faces=mesh.faces
+        )
+        np.testing.assert_allclose(smoothed.vertices, expected.vertices, atol=1e-12)
+        np.testing.assert_array_equal(smoothed.faces, expected.faces)
 
 
 class TestMeshOps:
@@ -122,6 +270,50 @@ class TestMeshOps:
         assert results['num_vertices'] > 0
         assert results['num_faces'] > 0
     
+    def test_validate_mesh_fast(self, simple_mesh):
+        """Test that fast validation agrees on the checks it runs."""
+        full = validate_mesh(simple_mesh)
+        fast = validate_mesh(simple_mesh, level='fast')
+        
+        for key in ('is_valid', 'is_watertight', 'is_winding_consistent',
+                    'num_vertices', 'num_faces', 'has_degenerate_faces', 'dimensions'):
+            assert fast[key] == full[key]
+        assert fast['has_duplicate_vertices'] is None
+        assert fast['is_volume'] is None
+    
+    def test_validate_mesh_invalid_level(self, simple_mesh):
+        """Test that an unknown level raises error."""
+        with pytest.raises(ValueError, match="Unknown validation level"):
+            validate_mesh(simple_mesh, level='quick')
+    
+    def test_validate_mesh_duplicate_vertices(self, simple_mesh):
+        """Test that duplicated vertices are counted."""
+        vertices = np.vstack([simple_mesh.vertices, simple_mesh.vertices[:3]])
+        mesh = trimesh.Trimesh(vertices=vertices, faces=simple_mesh.faces, process=False)
+        
+        results = validate_mesh(mesh)
+        
+        assert results['has_duplicate_vertices']
+        assert results['duplicate_vertices'] == 3
+        assert not validate_mesh(simple_mesh)['has_duplicate_vertices']
+    
+    @pytest.mark.parametrize("level", ['full', 'fast'])
+    def test_validate_mesh_after_inplace_edit(self, level):
+        """Test that validation sees in-place vertex edits made after a cached read."""
+        mesh = trimesh.creation.box()
+        assert np.isclose(mesh.area, 6.0)  # Populate the cache
+        mesh.vertices *= 2
+        
+        results = validate_mesh(mesh, level=level)
+        
+        assert np.isclose(results['surface_area'], 24.0)
+        np.testing.assert_allclose(results['bounds'], [[-1, -1, -1], [1, 1, 1]])
+        if level == 'full':
+            assert np.isclose(results['volume'], 8.0)
+        # The mesh's own cache is left consistent
+        assert np.isclose(mesh.area, 24.0)
+        assert np.isclose(mesh.volume, 8.0)
+    
     def test_smooth_mesh(self, simple_mesh):
         """Test mesh smoothing."""
         smoothed = smooth_mesh(simple_mesh, iterations=2, lambda_factor=0.3)
@@ -129,6 +321,53 @@ class TestMeshOps:
         assert isinstance(smoothed, trimesh.Trimesh)
         assert len(smoothed.vertices) == len(simple_mesh.vertices)
         assert len(smoothed.faces) == len(simple_mesh.faces)
+    
+    @pytest.mark.parametrize("isolated", [False, True])
+    def test_smooth_mesh_matches_reference(self, rng, isolated):
+        """Test sparse smoothing against the per-vertex neighbour mean."""
+        mesh = _noisy_icosphere(rng, isolated=isolated)
+        
+        smoothed = smooth_mesh(mesh, iterations=3, lambda_factor=0.4)
+        
+        expected = _reference_smooth(mesh.vertices, mesh.faces, 3, 0.4)
+        np.testing.assert_allclose(smoothed.vertices, expected, atol=1e-12)
+        if isolated:
+            # Unreferenced vertices are left in place
+            np.testing.assert_array_equal(smoothed.vertices[0], mesh.vertices[0])
+    
+    def test_slice_mesh_horizontal(self, simple_mesh):
+        """Test slicing returns contour points on the cylinder wall."""
+        contour = slice_mesh_horizontal(simple_mesh, z_height=0.0)
+        
+        # Points lie on the 16-sided polygon around the origin
+        radii = np.linalg.norm(contour, axis=1)
+        assert contour.shape[1] == 2
+        assert np.all(radii >= 10.0 * np.cos(np.pi / 16) - 1e-9)
+        assert np.all(radii <= 10.0 + 1e-9)
+    
+    def test_slice_mesh_horizontal_multi(self):
+        """Test multi-height slicing against trimesh's section_multiplane."""
+        mesh = trimesh.creation.icosphere(subdivisions=2, radius=10.0)
+        
+        # Every interior vertex z-level (planes through vertices sit on
+        # the span filter's tolerance edge), heights between levels and
+        # one above the mesh
+        vertex_z = np.unique(mesh.vertices[:, 2])
+        heights = np.concatenate([vertex_z[1:-1], [0.3, -2.7, 50.0]])
+        
+        contours = slice_mesh_horizontal_multi(mesh, heights)
+        sections = mesh.section_multiplane(
+            plane_origin=[0, 0, 0], plane_normal=[0, 0, 1], heights=heights
+        )
+        
+        assert len(contours) == len(heights)
+        assert len(contours[-1]) == 0  # Above the mesh
+        for contour, section in zip(contours, sections):
+            if section is None:
+                assert len(contour) == 0
+                continue
+            expected = np.unique(section.to_3D().vertices[:, :2].round(9), axis=0)
+            np.testing.assert_allclose(np.unique(contour.round(9), axis=0), expected)
 
 
 class TestSweep:
@@ -0,0 +1,111 @@
+"""Tests for agent-based tunnelling."""
+
+import pytest
+import numpy as np
+
+from src.algorithms.tunnelling import carve_tunnels_random_walk, NUMBA_AVAILABLE
+from src.geometry.boundaries import make_vase_mask, pack_mask
+
+
+@pytest.fixture
+def field_and_mask(rng):
+    """Provide a random field with a vase mask."""
+    mask, _ = make_vase_mask(n=32)
+    field = rng.random((32, 32, 32))
+    return field, mask
+
+
+class TestRandomWalkTunnelling:
+    """Tests for carve_tunnels_random_walk."""
+    
+    @pytest.mark.parametrize("use_numba", [False, True])
+    def test_carving_only_reduces_values(self, field_and_mask, use_numba):
+        """Test that carving never increases field values."""
+        field, mask = field_and_mask
+        
+        carved = carve_tunnels_random_walk(
+            field, mask, n_agents=5, agent_steps=50, radius=2.0,
+            random_seed=42, use_numba=use_numba
+        )
+        
+        assert carved.shape == field.shape
+        assert np.all(carved <= field)
+        assert np.any(carved < field)
+    
+    @pytest.mark.parametrize("use_numba", [False, True])
+    def test_reproducible_with_seed(self, field_and_mask, use_numba):
+        """Test that the same seed gives the same tunnels."""
+        field, mask = field_and_mask
+        
+        kwargs = dict(n_agents=3, agent_steps=40, radius=1.5, random_seed=7, use_numba=use_numba)
+        a = carve_tunnels_random_walk(field, mask, **kwargs)
+        b = carve_tunnels_random_walk(field, mask, **kwargs)
+        
+        np.testing.assert_array_equal(a, b)
+    
+    @pytest.mark.parametrize("use_numba", [False, True])
+    def test_packed_mask_matches_unpacked(self, field_and_mask, use_numba):
+        """Test that a bit-packed mask gives the same tunnels."""
+        field, mask = field_and_mask
+        
+        kwargs = dict(n_agents=4, agent_steps=60, radius=2.0, random_seed=11, use_numba=use_numba)
+        a = carve_tunnels_random_walk(field, mask, **kwargs)
+        b = carve_tunnels_random_walk(field, pack_mask(mask), **kwargs)
+        
+        np.testing.assert_array_equal(a, b)
+    
+    def test_mismatched_mask_shape(self, field_and_mask):
+        """Test that a mask of the wrong shape raises error."""
+        field, _ = field_and_mask
+        
+        with pytest.raises(ValueError, match="doesn't match field shape"):
+            carve_tunnels_random_walk(field, np.ones((16, 16, 16), dtype=bool))
+    
+    @pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba not available")
+    def test_numba_matches_numpy(self, field_and_mask):
+        """Test that both backends carve identical tunnels for a seed."""
+        field, mask = field_and_mask
+        
+        kwargs = dict(n_agents=6, agent_steps=80, radius=2.5, random_seed=21)
+        a = carve_tunnels_random_walk(field, mask, use_numba=False, **kwargs)
+        b = carve_tunnels_random_walk(field, mask, use_numba=True, **kwargs)
+        
+        np.testing.assert_array_equal(a, b)
+    
+    def test_input_not_modified(self, field_and_mask):
+        """Test that the input field is left untouched."""
+        field, mask = field_and_mask
+        original = field.copy()
+        
+        carve_tunnels_random_walk(field, mask, n_agents=3, agent_steps=20, random_seed=1)
+        
+        np.testing.assert_array_equal(field, original)
+    
+    def test_no_agents_returns_copy(self, field_and_mask):
+        """Test that zero agents leaves the field unchanged."""
+        field, mask = field_and_mask
+        
+        carved = carve_tunnels_random_walk(field, mask, n_agents=0)
+        
+        np.testing.assert_array_equal(carved, field)
+        assert carved is not field
+    
+    def test_empty_mask(self, field_and_mask):
+        """Test that an empty mask leaves the field unchanged."""
+        field, _ = field_and_mask
+        mask = np.zeros(field.shape, dtype=bool)
+        
+        carved = carve_tunnels_random_walk(field, mask, n_agents=3, agent_steps=10)
+        
+        np.testing.assert_array_equal(carved, field)
+    
+    @pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba not available")
+    def test_numba_float32_field(self, field_and_mask):
+        """Test that the Numba kernel preserves the field dtype."""
+        field, mask = field_and_mask
+        field = field.astype(np.float32)
+        
+        carved = carve_tunnels_random_walk(field, mask, n_agents=2, agent_steps=20, random_seed=3)
+        
+        assert carved.dtype == np.float32
+        assert np.all(carved <= field)